@@ -14,6 +14,7 @@ import json
 import argparse
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import lru_cache
 from dateutil.relativedelta import relativedelta
 from tenacity import retry, stop_after_attempt, wait_fixed
 from arcgis.gis import GIS
@@ -37,6 +38,14 @@ TARGET_STATUSES = [
 IMMEDIATE_UPDATE_STATUSES = ['YellowKilledThisYear', 'OrangeDeadHeaded']
 TWO_YEAR_RULE_STATUSES = ['GreenNoRegrowthThisYear']
 
+# Fields read by the rollover rules and Excel export (queried instead of '*')
+ROLLOVER_QUERY_FIELDS = [
+    'OBJECTID', 'SpeciesDropDown', 'ParentStatusWithDomain',
+    'DateForNextVisitFromLastVisit', 'DateVisitMadeFromLastVisit',
+    'DateOfLastCreateFromLastVisit', 'DateDiscovered',
+    'audit_log', 'iNatURL', 'RegionCode', 'DistrictCode'
+]
+
 
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
 def connect_arcgis():
@@ -48,13 +57,18 @@ def connect_arcgis():
     return GIS(portal_url, username, password)
 
 
-def get_layers_and_table(gis, environment):
-    """Get weed locations layer and audit table for the specified environment"""
+@lru_cache(maxsize=1)
+def load_environment_config():
+    """Load the shared environment_config.json once per process (callers must not mutate it)"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     env_config_path = os.path.join(script_dir, '..', 'spatial_field_updater', 'config', 'environment_config.json')
-    
     with open(env_config_path, 'r') as f:
-        env_config = json.load(f)
+        return json.load(f)
+
+
+def get_layers_and_table(gis, environment):
+    """Get weed locations layer and audit table for the specified environment"""
+    env_config = load_environment_config()
     
     if environment not in env_config:
         available_envs = list(env_config.keys())
@@ -379,18 +393,19 @@ def should_update_record(record, reference_date):
     return True, decision
 
 
-def create_audit_log_entry(previous_status, existing_audit_log):
+def create_audit_log_entry(previous_status, existing_audit_log, run_date=None):
     """
     Create new audit log entry
     
     Args:
         previous_status: The status before update
         existing_audit_log: Current audit_log content (may be None/empty)
+        run_date: Date to stamp the entry with (default: now)
     
     Returns:
         str: New audit log content (truncated to 4000 chars if needed)
     """
-    today = datetime.now().strftime('%Y-%m-%d')
+    today = (run_date or datetime.now()).strftime('%Y-%m-%d')
     new_entry = f"{today} Annual rollover from {previous_status} to Purple"
     
     if existing_audit_log:
@@ -462,6 +477,22 @@ def backup_all_statuses(weed_layer, dry_run=False):
             print(f"   🔍 DRY RUN - Would backup {total_to_backup} status values")
             return total_to_backup
         
+        # Copy every status with one server-side calculate instead of paging
+        # all records down and sending them back in edit batches
+        if getattr(weed_layer.properties, 'supportsCalculate', False):
+            try:
+                result = weed_layer.calculate(
+                    where=where_clause,
+                    calc_expression={'field': 'StatusAt202510', 'sqlExpression': 'ParentStatusWithDomain'}
+                )
+                if result and result.get('success'):
+                    total_backed_up = result.get('updatedFeatureCount', total_to_backup)
+                    print(f"   ✅ Backed up {total_backed_up}/{total_to_backup} status values with a single calculate")
+                    return total_backed_up
+                print(f"   Calculate did not succeed ({result}), falling back to batched edits...")
+            except Exception as calc_error:
+                print(f"   Calculate failed ({calc_error}), falling back to batched edits...")
+        
         # Process in batches to handle large datasets
         all_features = []
         offset = 0
@@ -559,24 +590,21 @@ def export_to_excel(updated_records, environment):
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
 def save_audit_record(gis, environment, records_processed, records_updated):
     """Save run information to audit table"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    env_config_path = os.path.join(script_dir, '..', 'spatial_field_updater', 'config', 'environment_config.json')
-    
-    with open(env_config_path, 'r') as f:
-        env_config = json.load(f)
+    env_config = load_environment_config()
     
     audit_table_id = env_config[environment]['audit_table_id']
     audit_table = Table.fromitem(gis.content.get(audit_table_id))
     
     # Check if record exists
     where_clause = f"ProcessName = 'annual_rollover' AND Environment = '{environment}'"
-    existing = audit_table.query(where=where_clause, return_all_records=False)
+    # Only the OBJECTID is needed, so skip building a FeatureSet
+    existing_ids = audit_table.query(where=where_clause, return_ids_only=True).get('objectIds') or []
     
     timestamp = datetime.now().isoformat()
     
-    if existing.features:
+    if existing_ids:
         # Update existing record
-        objectid = existing.features[0].attributes['OBJECTID']
+        objectid = existing_ids[0]
         audit_table.edit_features(updates=[{
             'attributes': {
                 'OBJECTID': objectid,
@@ -648,6 +676,10 @@ def process_annual_rollover(environment, dry_run=False, limit=None):
     if limit:
         print(f"⚠️  Processing limited to {limit} records for testing")
     
+    # Only request the fields the rules and export use, skipping any the layer lacks
+    layer_field_names = {field.name for field in weed_layer.properties.fields}
+    out_fields = [name for name in ROLLOVER_QUERY_FIELDS if name in layer_field_names] or '*'
+    
     # Get features using pagination for large datasets
     try:
         print(f"Executing query: {where_clause}")
@@ -656,7 +688,7 @@ def process_annual_rollover(environment, dry_run=False, limit=None):
             # For limited queries, use simple approach
             features = weed_layer.query(
                 where=where_clause,
-                out_fields='*',
+                out_fields=out_fields,
                 return_geometry=False,
                 result_record_count=limit
             )
@@ -677,7 +709,7 @@ def process_annual_rollover(environment, dry_run=False, limit=None):
                     try:
                         page_features = weed_layer.query(
                             where=where_clause,
-                            out_fields='*',
+                            out_fields=out_fields,
                             return_geometry=False,
                             result_offset=offset,
                             result_record_count=current_page_size
@@ -751,21 +783,23 @@ def process_annual_rollover(environment, dry_run=False, limit=None):
     # Process each record
     updates = []
     updated_records = []
-    decisions = []
+    
+    # Stamp every record in this run with the same time
+    run_timestamp = datetime.now()
+    update_timestamp = run_timestamp.strftime('%Y-%m-%d %H:%M:%S')
     
     for feature in features.features:
         record = feature.attributes
         
         # Determine if record should be updated
         should_update, decision = should_update_record(record, reference_date)
-        decisions.append(decision)
         
         if should_update:
             # Create backup of original status
             original_status = record['ParentStatusWithDomain']
             
             # Create new audit log entry
-            new_audit_log = create_audit_log_entry(original_status, record.get('audit_log'))
+            new_audit_log = create_audit_log_entry(original_status, record.get('audit_log'), run_timestamp)
             
             # Prepare update
             update_dict = {
@@ -794,7 +828,7 @@ def process_annual_rollover(environment, dry_run=False, limit=None):
                 'TimeCheck': decision.get('time_check'),
                 'NewStatus': 'PurpleHistoric',
                 'NewAuditLog': new_audit_log,
-                'UpdateTimestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                'UpdateTimestamp': update_timestamp
             }
             
             updated_records.append(export_record)
@@ -11,6 +11,8 @@ Tests all 36 test cases from REQUIREMENTS.md:
 import unittest
 from datetime import datetime, date
 from unittest.mock import Mock, patch
+import io
+from contextlib import redirect_stdout
 import sys
 import os
 
@@ -20,7 +22,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from annual_rollover import (
     resolve_last_visit_date, is_next_visit_due, meets_time_criteria,
     should_update_record, create_audit_log_entry, validate_backup_field,
-    TARGET_SPECIES, TARGET_STATUSES
+    backup_all_statuses, save_audit_record, process_annual_rollover,
+    ROLLOVER_QUERY_FIELDS, TARGET_SPECIES, TARGET_STATUSES
 )
 
 
@@ -310,7 +313,13 @@ class TestAnnualRollover(unittest.TestCase):
         
         self.assertIn("Annual rollover from GreenNoRegrowthThisYear to Purple", new_log)
         self.assertNotIn(";", new_log)  # No semicolon when no existing log
-    
+
+    def test_audit_log_uses_run_date(self):
+        """Test audit log entry is stamped with the supplied run date"""
+        new_log = create_audit_log_entry("YellowKilledThisYear", None, datetime(2025, 10, 2, 9, 30))
+
+        self.assertTrue(new_log.startswith("2025-10-02 Annual rollover"))
+
     def test_audit_log_truncation(self):
         """Test audit log truncation at 4000 characters"""
         # Create a very long existing audit log
@@ -396,6 +405,82 @@ class TestAnnualRollover(unittest.TestCase):
         # Should return False but not raise in dry run mode
         result = validate_backup_field(mock_layer_without_field, dry_run=True)
         self.assertFalse(result)
+    
+    def test_backup_uses_single_calculate(self):
+        """Test status backup is one server-side calculate when supported"""
+        mock_layer = Mock()
+        mock_layer.query.return_value = 42
+        mock_layer.properties.supportsCalculate = True
+        mock_layer.calculate.return_value = {'success': True, 'updatedFeatureCount': 42}
+        
+        self.assertEqual(backup_all_statuses(mock_layer), 42)
+        mock_layer.calculate.assert_called_once_with(
+            where="ParentStatusWithDomain IS NOT NULL",
+            calc_expression={'field': 'StatusAt202510', 'sqlExpression': 'ParentStatusWithDomain'}
+        )
+        mock_layer.edit_features.assert_not_called()
+    
+    def run_rollover_query(self, layer_field_names):
+        """Run a limited dry run against a mock layer and return the query out_fields"""
+        fields = []
+        for name in layer_field_names:
+            field = Mock()
+            field.name = name
+            fields.append(field)
+        mock_layer = Mock()
+        mock_layer.properties.fields = fields
+        mock_layer.query.return_value = Mock(features=[])
+        
+        with patch('annual_rollover.connect_arcgis'), \
+                patch('annual_rollover.get_layers_and_table', return_value=(mock_layer, Mock())), \
+                patch('annual_rollover.validate_backup_field', return_value=False), \
+                redirect_stdout(io.StringIO()):
+            process_annual_rollover('development', dry_run=True, limit=5)
+        
+        mock_layer.query.assert_called_once()
+        return mock_layer.query.call_args.kwargs['out_fields']
+    
+    def test_query_fields_skip_missing_layer_fields(self):
+        """Test the rollover query requests only the known fields the layer has"""
+        layer_field_names = [name for name in ROLLOVER_QUERY_FIELDS if name != 'iNatURL']
+        out_fields = self.run_rollover_query(layer_field_names + ['StatusAt202510', 'EditDate'])
+        self.assertEqual(out_fields, layer_field_names)
+    
+    def test_query_fields_fall_back_to_all(self):
+        """Test the rollover query falls back to '*' when no known fields match"""
+        out_fields = self.run_rollover_query(['Shape', 'GlobalID'])
+        self.assertEqual(out_fields, '*')
+    
+    def run_save_audit_record(self, query_result):
+        """Run save_audit_record against a mock audit table returning query_result"""
+        mock_table = Mock()
+        mock_table.query.return_value = query_result
+        with patch('annual_rollover.Table.fromitem', return_value=mock_table), \
+                redirect_stdout(io.StringIO()):
+            save_audit_record(Mock(), 'development', 10, 5)
+        mock_table.query.assert_called_once_with(
+            where="ProcessName = 'annual_rollover' AND Environment = 'development'",
+            return_ids_only=True
+        )
+        return mock_table
+    
+    def test_audit_record_updates_existing_row(self):
+        """Test an existing audit row id from return_ids_only is updated in place"""
+        mock_table = self.run_save_audit_record({'objectIdFieldName': 'OBJECTID', 'objectIds': [42]})
+        kwargs = mock_table.edit_features.call_args.kwargs
+        self.assertEqual(list(kwargs), ['updates'])
+        self.assertEqual(kwargs['updates'][0]['attributes']['OBJECTID'], 42)
+        self.assertIn('LastRunTimestamp', kwargs['updates'][0]['attributes'])
+    
+    def test_audit_record_adds_missing_row(self):
+        """Test empty or None objectIds inserts a new audit row"""
+        for object_ids in ([], None):
+            mock_table = self.run_save_audit_record({'objectIdFieldName': 'OBJECTID', 'objectIds': object_ids})
+            kwargs = mock_table.edit_features.call_args.kwargs
+            self.assertEqual(list(kwargs), ['adds'])
+            attributes = kwargs['adds'][0]['attributes']
+            self.assertEqual(attributes['ProcessName'], 'annual_rollover')
+            self.assertEqual(attributes['Environment'], 'development')
 
 
 if __name__ == '__main__':
@@ -849,7 +849,8 @@ def check_field_mismatches(merged_df, ignore_creation_edit_dates=False):
   return result_df, mismatch_columns, active_rules
 
 
-def generate_mismatch_report(merged_df, output_file='weed_visits_field_comparison.xlsx', ignore_creation_edit_dates=False):
+def generate_mismatch_report(merged_df, output_file='weed_visits_field_comparison.xlsx', ignore_creation_edit_dates=False,
+                             mismatch_check=None):
   """
   Generate Excel spreadsheet with summary and detailed mismatch data
   
@@ -857,9 +858,12 @@ def generate_mismatch_report(merged_df, output_file='weed_visits_field_compariso
     merged_df: DataFrame with merged data
     output_file: Path to output Excel file
     ignore_creation_edit_dates: If True, skip audit fields (CreationDate_1 and EditDate_1)
+    mismatch_check: Optional result of check_field_mismatches(merged_df) already computed by the caller
   """
-  # Check field mismatches
-  result_df, mismatch_columns, active_rules = check_field_mismatches(merged_df, ignore_creation_edit_dates)
+  # Check field mismatches (reuse the caller's result when given)
+  if mismatch_check is None:
+    mismatch_check = check_field_mismatches(merged_df, ignore_creation_edit_dates)
+  result_df, mismatch_columns, active_rules = mismatch_check
   
   # Calculate summary statistics
   total_locations = len(result_df)
@@ -1168,16 +1172,16 @@ def format_report(counts):
   
   # Category 1: Matching DateCheck
   matching = counts['matching_datecheck']
-  matching_pct = (matching / total * 100) if total > 0 else 0
+  matching_pct = matching / total * 100
   report.append(f"\n1. DateVisitMadeFromLastVisit == Latest Visit DateCheck")
   report.append(f"   Count: {matching:,} ({matching_pct:.1f}%)")
   report.append(f"   Status: ✓ Dates are synchronized with visit DateCheck")
   
   # Category 2: Weed set, visit DateCheck not set
   weed_set = counts['weed_set_visit_datecheck_not']
-  weed_set_pct = (weed_set / total * 100) if total > 0 else 0
+  weed_set_pct = weed_set / total * 100
   weed_matches_creation = counts['weed_matches_visit_creation']
-  weed_matches_creation_pct = (weed_matches_creation / weed_set * 100) if weed_set > 0 else 0
+  weed_matches_creation_pct = weed_matches_creation / (weed_set or 1) * 100  # subset of weed_set, so 0 when empty
   report.append(f"\n2. DateVisitMadeFromLastVisit SET, but Latest Visit DateCheck NOT SET")
   report.append(f"   Count: {weed_set:,} ({weed_set_pct:.1f}%)")
   report.append(f"   Status: ⚠ Weed location has date but no related visit DateCheck")
@@ -1186,14 +1190,14 @@ def format_report(counts):
   
   # Category 3: Weed not set
   weed_not_set = counts['weed_not_set']
-  weed_not_set_pct = (weed_not_set / total * 100) if total > 0 else 0
+  weed_not_set_pct = weed_not_set / total * 100
   report.append(f"\n3. DateVisitMadeFromLastVisit NOT SET")
   report.append(f"   Count: {weed_not_set:,} ({weed_not_set_pct:.1f}%)")
   report.append(f"   Status: ℹ Weed location has no visit date recorded")
   
   # Category 4: Not matching
   not_matching = counts['not_matching']
-  not_matching_pct = (not_matching / total * 100) if total > 0 else 0
+  not_matching_pct = not_matching / total * 100
   report.append(f"\n4. DateVisitMadeFromLastVisit != Latest Visit DateCheck")
   report.append(f"   Count: {not_matching:,} ({not_matching_pct:.1f}%)")
   report.append(f"   Status: ✗ Dates are out of sync")
@@ -1204,31 +1208,31 @@ def format_report(counts):
   report.append("-" * 80)
   
   has_visit_datecheck = counts['has_visit_datecheck']
-  has_visit_datecheck_pct = (has_visit_datecheck / total * 100) if total > 0 else 0
+  has_visit_datecheck_pct = has_visit_datecheck / total * 100
   report.append(f"\n1. Latest Visit DateCheck is SET")
   report.append(f"   Count: {has_visit_datecheck:,} ({has_visit_datecheck_pct:.1f}%)")
   report.append(f"   Priority: Highest - Use this date")
   
   has_visit_creation = counts['has_visit_creation_only']
-  has_visit_creation_pct = (has_visit_creation / total * 100) if total > 0 else 0
+  has_visit_creation_pct = has_visit_creation / total * 100
   report.append(f"\n2. Latest Visit Creation_Date1 is SET (DateCheck not set)")
   report.append(f"   Count: {has_visit_creation:,} ({has_visit_creation_pct:.1f}%)")
   report.append(f"   Priority: High - Fallback to creation date")
   
   has_weed_discovered = counts['has_weed_discovered_only']
-  has_weed_discovered_pct = (has_weed_discovered / total * 100) if total > 0 else 0
+  has_weed_discovered_pct = has_weed_discovered / total * 100
   report.append(f"\n3. Weed DateDiscovered is SET (no visit dates)")
   report.append(f"   Count: {has_weed_discovered:,} ({has_weed_discovered_pct:.1f}%)")
   report.append(f"   Priority: Medium - Use weed discovery date")
   
   has_weed_creation = counts['has_weed_creation_only']
-  has_weed_creation_pct = (has_weed_creation / total * 100) if total > 0 else 0
+  has_weed_creation_pct = has_weed_creation / total * 100
   report.append(f"\n4. Weed Creation_Date1 is SET (no other dates)")
   report.append(f"   Count: {has_weed_creation:,} ({has_weed_creation_pct:.1f}%)")
   report.append(f"   Priority: Low - Last resort date")
   
   has_no_dates = counts['has_no_dates']
-  has_no_dates_pct = (has_no_dates / total * 100) if total > 0 else 0
+  has_no_dates_pct = has_no_dates / total * 100
   report.append(f"\n5. NO DATES SET")
   report.append(f"   Count: {has_no_dates:,} ({has_no_dates_pct:.1f}%)")
   report.append(f"   Priority: None - No date information available")
@@ -1743,15 +1747,16 @@ def analyze_weed_visits(environment, output_file=None, ignore_creation_edit_date
     output_file = f'weed_visits_field_comparison_{environment}_{timestamp}.xlsx'
   
   print("\nAnalyzing field mismatches...")
+  # Compute mismatches once per merged_df; the report, corrections and final summary share it
+  mismatch_check = check_field_mismatches(merged_df, ignore_creation_edit_dates)
   overall_summary, field_summary, mismatches = generate_mismatch_report(
-    merged_df, output_file, ignore_creation_edit_dates
+    merged_df, output_file, ignore_creation_edit_dates, mismatch_check
   )
   
   # Apply corrections if requested
   corrections_df = None
   if correct_mismatches_flag:
-    # Re-check for mismatches using the result_df from check_field_mismatches
-    result_df, mismatch_columns, active_rules = check_field_mismatches(merged_df, ignore_creation_edit_dates)
+    result_df, mismatch_columns, active_rules = mismatch_check
     corrections_df = correct_mismatches(
       weed_layer, 
       result_df, 
@@ -1809,8 +1814,9 @@ def analyze_weed_visits(environment, output_file=None, ignore_creation_edit_date
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         post_correction_file = f'weed_visits_field_comparison_{environment}_after_corrections_{timestamp}.xlsx'
         print(f"\nGenerating post-correction analysis report...")
+        mismatch_check = check_field_mismatches(merged_df, ignore_creation_edit_dates)
         overall_summary, field_summary, mismatches = generate_mismatch_report(
-          merged_df, post_correction_file, ignore_creation_edit_dates
+          merged_df, post_correction_file, ignore_creation_edit_dates, mismatch_check
         )
         print(f"Post-correction report saved to: {post_correction_file}")
   
@@ -1820,7 +1826,7 @@ def analyze_weed_visits(environment, output_file=None, ignore_creation_edit_date
   print("=" * 80)
   
   # Get mismatch counts by field
-  result_df, mismatch_columns, active_rules = check_field_mismatches(merged_df, ignore_creation_edit_dates)
+  result_df, mismatch_columns, active_rules = mismatch_check
   
   print(f"\nTotal WeedLocations: {len(result_df):,}")
   print(f"Locations with visits: {result_df['Visit_OBJECTID'].notna().sum():,}")
@@ -16,18 +16,67 @@ Date: 2024
 
 import json
 import os
+import re
+import sys
 import warnings
-from typing import List, Dict, Any
-from arcgis.gis import GIS
-import pandas as pd
+from collections import Counter
+from typing import List, Dict, Any, TYPE_CHECKING
 
+try:
+    import orjson  # Optional: faster JSON export
+except ImportError:
+    orjson = None
 
+# arcgis and pandas are slow to import, so they are only loaded where used
+if TYPE_CHECKING:
+    from arcgis.gis import GIS
+
+
+# Tags that indicate a web map is intended for Field Maps use (lowercase)
+FIELD_MAPS_TAGS = frozenset(sys.intern(tag) for tag in (
+    'field maps', 'field_maps', 'fieldmaps', 'mobile', 'offline',
+    'data collection', 'collector', 'survey123'
+))
+
+# Lowercased, interned form of each raw tag seen so far
+_TAG_CACHE: Dict[str, str] = {}
+
+
+def _normalize_tag(tag: str) -> str:
+    """Return the lowercased, interned form of a tag, caching repeat lookups."""
+    normalized = _TAG_CACHE.get(tag)
+    if normalized is None:
+        normalized = _TAG_CACHE[tag] = sys.intern(tag.lower())
+    return normalized
+
+
+# Case-insensitive keyword scans over stringified web map JSON (avoids a lowercased copy)
+_OFFLINE_RE = re.compile(r'offline', re.IGNORECASE)
+_SYNC_OR_OFFLINE_RE = re.compile(r'sync|offline', re.IGNORECASE)
+
+# Number of web maps analyzed between progress messages
+PROGRESS_INTERVAL = 100
+
+# Shown in reports for layer counts that fast mode (DETAIL=0) did not measure
+NOT_ANALYSED = 'n/a'
+
+
+def _format_count(value):
+    """Return a layer count for display, or NOT_ANALYSED if it was never measured."""
+    return NOT_ANALYSED if value is None else value
+
+
+def _count_with_editable_layers(results: List[Dict[str, Any]]):
+    """Count web maps with editable layers, or NOT_ANALYSED if any were not measured."""
+    if any(r.get('editable_layers', 0) is None for r in results):
+        return NOT_ANALYSED
+    return sum(1 for r in results if r.get('editable_layers', 0) > 0)
 
 
 class FieldMapsWebMapAnalyzer:
     """Analyzes web maps to identify those configured for Field Maps use."""
     
-    def __init__(self, gis: GIS):
+    def __init__(self, gis: 'GIS'):
         """
         Initialize the analyzer with a GIS connection.
         
@@ -37,12 +86,15 @@ class FieldMapsWebMapAnalyzer:
         self.gis = gis
         self.field_maps_webmaps = []
         
-    def analyze_webmap_for_field_maps(self, webmap_item) -> Dict[str, Any]:
+    def analyze_webmap_for_field_maps(self, webmap_item, fast_mode: bool = False) -> Dict[str, Any]:
         """
         Analyze a web map item to determine Field Maps compatibility.
         
         Args:
             webmap_item: Web map item to analyze
+            fast_mode: Stop at the first Field Maps indicator found, checking
+                tags before fetching the web map definition. Layer counts that
+                are skipped as a result are left as None rather than 0.
             
         Returns:
             Dictionary with analysis results
@@ -54,8 +106,9 @@ class FieldMapsWebMapAnalyzer:
         analysis = {
             'is_field_maps_enabled': False,
             'field_maps_indicators': [],
-            'total_layers': 0,
-            'editable_layers': 0,
+            # None marks counts that fast mode may skip measuring
+            'total_layers': None if fast_mode else 0,
+            'editable_layers': None if fast_mode else 0,
             'sync_enabled_layers': 0,
             'layer_details': [],
             'title': webmap_item.title,
@@ -66,6 +119,15 @@ class FieldMapsWebMapAnalyzer:
             'modified': webmap_item.modified
         }
         
+        # Check tags for Field Maps indicators (no network access needed)
+        webmap_tags = frozenset(map(_normalize_tag, webmap_item.tags or ()))
+        tag_indicators = [f'Has relevant tag: {tag}' for tag in sorted(webmap_tags & FIELD_MAPS_TAGS)]
+        
+        if fast_mode and tag_indicators:
+            analysis['field_maps_indicators'].append(tag_indicators[0])
+            analysis['is_field_maps_enabled'] = True
+            return analysis
+        
         try:
             # Get web map definition to analyze layers
             webmap_data = webmap_item.get_data()
@@ -86,6 +148,10 @@ class FieldMapsWebMapAnalyzer:
                     if 'FeatureServer' in layer_url:
                         has_feature_services = True
                         
+                        # Skip the per-layer capability lookups in fast mode
+                        if fast_mode:
+                            break
+                        
                         # Try to get the actual layer to check capabilities
                         try:
                             layer_item = self.gis.content.get(layer.get('itemId', ''))
@@ -103,31 +169,32 @@ class FieldMapsWebMapAnalyzer:
                 except Exception as e:
                     print(f"Warning: Could not analyze layer in {webmap_item.title}: {str(e)}")
                     
-            analysis['editable_layers'] = editable_count
+            # Fast mode stops at the first FeatureServer, before any capability lookups
+            if not (fast_mode and has_feature_services):
+                analysis['editable_layers'] = editable_count
             
             if has_feature_services:
                 analysis['field_maps_indicators'].append('Has feature service layers')
                 analysis['is_field_maps_enabled'] = True
+                if fast_mode:
+                    return analysis
             
-            # Check tags for Field Maps indicators
-            field_maps_tags = ['field maps', 'fieldmaps', 'mobile', 'offline', 'data collection']
-            webmap_tags_lower = [tag.lower() for tag in webmap_item.tags]
-            
-            for tag in field_maps_tags:
-                if tag in webmap_tags_lower:
-                    analysis['field_maps_indicators'].append(f'Has relevant tag: {tag}')
-                    analysis['is_field_maps_enabled'] = True
+            if tag_indicators:
+                analysis['field_maps_indicators'].extend(tag_indicators)
+                analysis['is_field_maps_enabled'] = True
                     
             # Check web map properties for Field Maps configuration
             try:
                 # Look for offline properties in web map definition
-                if 'offline' in str(webmap_data).lower():
+                if _OFFLINE_RE.search(str(webmap_data)):
                     analysis['field_maps_indicators'].append('Contains offline configuration')
                     analysis['is_field_maps_enabled'] = True
+                    if fast_mode:
+                        return analysis
                     
                 # Check for sync capabilities in operational layers
                 for op_layer in operational_layers:
-                    if 'sync' in str(op_layer).lower() or 'offline' in str(op_layer).lower():
+                    if _SYNC_OR_OFFLINE_RE.search(str(op_layer)):
                         analysis['field_maps_indicators'].append('Has operational layers with sync capabilities')
                         analysis['is_field_maps_enabled'] = True
                         break
@@ -136,7 +203,7 @@ class FieldMapsWebMapAnalyzer:
                 print(f"Warning: Could not analyze web map definition for {webmap_item.title}: {str(e)}")
             
             # Determine overall Field Maps enablement
-            if analysis['is_field_maps_enabled'] or analysis['editable_layers'] > 0:
+            if analysis['is_field_maps_enabled'] or (analysis['editable_layers'] or 0) > 0:
                 analysis['is_field_maps_enabled'] = True
                 
         except Exception as e:
@@ -187,13 +254,15 @@ class FieldMapsWebMapAnalyzer:
             print(f"Warning: Could not determine sharing for {webmap_item.title}: {str(e)}")
             return "Unknown"
     
-    def find_field_maps_webmaps(self, search_query: str = "*", max_items: int = 10000) -> List[Dict[str, Any]]:
+    def find_field_maps_webmaps(self, search_query: str = "*", max_items: int = 10000,
+                                fast_mode: bool = False) -> List[Dict[str, Any]]:
         """
         Search for and analyze web maps for Field Maps compatibility.
         
         Args:
             search_query: Search query for web maps (default: all web maps)
             max_items: Maximum number of items to analyze
+            fast_mode: Stop each analysis at the first Field Maps indicator found
             
         Returns:
             List of analysis results for Field Maps-enabled web maps
@@ -212,18 +281,18 @@ class FieldMapsWebMapAnalyzer:
         print(f"Found {len(webmap_items)} web maps to analyze")
         
         field_maps_webmaps = []
+        total_items = len(webmap_items)
         
         for i, webmap_item in enumerate(webmap_items, 1):
-            print(f"Analyzing {i}/{len(webmap_items)}: {webmap_item.title}")
-            
-            analysis = self.analyze_webmap_for_field_maps(webmap_item)
+            analysis = self.analyze_webmap_for_field_maps(webmap_item, fast_mode=fast_mode)
             
             # Only include if it shows Field Maps indicators
             if analysis['is_field_maps_enabled']:
                 field_maps_webmaps.append(analysis)
-                print(f"  ✓ Field Maps enabled: {', '.join(analysis['field_maps_indicators'])}")
-            else:
-                print(f"  ✗ No Field Maps indicators found")
+            
+            # Report progress periodically rather than once per web map
+            if i % PROGRESS_INTERVAL == 0 or i == total_items:
+                print(f"Analyzed {i}/{total_items} web maps ({len(field_maps_webmaps)} Field Maps enabled)")
                 
         return field_maps_webmaps
     
@@ -235,8 +304,12 @@ class FieldMapsWebMapAnalyzer:
             results: Analysis results to export
             output_file: Output file path
         """
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(results, default=str, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(results, f, indent=2, default=str)
         print(f"Results exported to {output_file}")
     
     def export_to_spreadsheet(self, results: List[Dict[str, Any]], output_file: str = "field_maps_webmaps.xlsx"):
@@ -247,6 +320,8 @@ class FieldMapsWebMapAnalyzer:
             results: Analysis results to export
             output_file: Output Excel file path
         """
+        import pandas as pd
+        
         # Sort results by title (layer name)
         sorted_results = sorted(results, key=lambda x: x['title'].lower())
         
@@ -273,8 +348,8 @@ class FieldMapsWebMapAnalyzer:
                 'Item ID': result['id'],
                 'Owner': result['owner'],
                 'Sharing': result.get('sharing', 'Unknown'),
-                'Total Layers': result.get('total_layers', 0),
-                'Editable Layers': result.get('editable_layers', 0),
+                'Total Layers': _format_count(result.get('total_layers', 0)),
+                'Editable Layers': _format_count(result.get('editable_layers', 0)),
                 'Sync Enabled Layers': result.get('sync_enabled_layers', 0),
                 'Field Maps Indicators': indicators,
                 'Created': created,
@@ -627,11 +702,24 @@ class FieldMapsWebMapAnalyzer:
 </body>
 </html>"""
 
-        # Calculate summary statistics
+        # Calculate summary statistics in a single pass over the results
         total_count = len(results)
-        offline_count = sum(1 for r in results if r.get('is_field_maps_enabled', False))
-        editable_count = sum(1 for r in results if r.get('editable_layers', 0) > 0)
-        unique_owners = len(set(r['owner'] for r in results))
+        offline_count = 0
+        editable_count = 0
+        editable_measured = True
+        owners = set()
+        for r in results:
+            if r.get('is_field_maps_enabled', False):
+                offline_count += 1
+            editable_layers = r.get('editable_layers', 0)
+            if editable_layers is None:
+                editable_measured = False
+            elif editable_layers > 0:
+                editable_count += 1
+            owners.add(r['owner'])
+        unique_owners = len(owners)
+        if not editable_measured:
+            editable_count = NOT_ANALYSED
         
         # Generate table rows
         table_rows = []
@@ -648,11 +736,11 @@ class FieldMapsWebMapAnalyzer:
             stats_html = f"""
                 <div class="stats-grid">
                     <div class="stats-item">
-                        <span class="stats-value">{result.get('total_layers', 0)}</span>
+                        <span class="stats-value">{_format_count(result.get('total_layers', 0))}</span>
                         <span class="stats-label">Total Layers</span>
                     </div>
                     <div class="stats-item">
-                        <span class="stats-value">{result.get('editable_layers', 0)}</span>
+                        <span class="stats-value">{_format_count(result.get('editable_layers', 0))}</span>
                         <span class="stats-label">Editable</span>
                     </div>
                     <div class="stats-item">
@@ -720,46 +808,53 @@ class FieldMapsWebMapAnalyzer:
         """
         Print a summary of Field Maps-enabled web maps.
         
+        The summary is assembled in memory and written in a single call.
+        
         Args:
             results: Analysis results to summarize
         """
-        print(f"\n{'='*60}")
-        print(f"FIELD MAPS WEB MAPS SUMMARY")
-        print(f"{'='*60}")
-        print(f"Total Field Maps-enabled web maps found: {len(results)}")
+        lines = [
+            f"\n{'='*60}",
+            "FIELD MAPS WEB MAPS SUMMARY",
+            f"{'='*60}",
+            f"Total Field Maps-enabled web maps found: {len(results)}"
+        ]
         
         if not results:
-            print("No Field Maps-enabled web maps found.")
+            lines.append("No Field Maps-enabled web maps found.")
+            sys.stdout.write('\n'.join(lines) + '\n')
             return
             
-        print(f"\n{'Title':<40} {'Owner':<15} {'Total Layers':<12} {'Editable Layers'}")
-        print(f"{'-'*40} {'-'*15} {'-'*12} {'-'*15}")
+        lines.append(f"\n{'Title':<40} {'Owner':<15} {'Total Layers':<12} {'Editable Layers'}")
+        lines.append(f"{'-'*40} {'-'*15} {'-'*12} {'-'*15}")
         
         for result in results:
             title = result['title'][:37] + "..." if len(result['title']) > 40 else result['title']
             owner = result['owner'][:12] + "..." if len(result['owner']) > 15 else result['owner']
-            total_layers = result.get('total_layers', 0)
-            editable_layers = result.get('editable_layers', 0)
+            total_layers = _format_count(result.get('total_layers', 0))
+            editable_layers = _format_count(result.get('editable_layers', 0))
             
-            print(f"{title:<40} {owner:<15} {total_layers:<12} {editable_layers}")
+            lines.append(f"{title:<40} {owner:<15} {total_layers:<12} {editable_layers}")
             
-        print(f"\n{'DETAILED ANALYSIS'}")
-        print(f"{'-'*60}")
+        lines.append(f"\n{'DETAILED ANALYSIS'}")
+        lines.append(f"{'-'*60}")
         
         for result in results:
-            print(f"\n🗺️  {result['title']}")
-            print(f"   ID: {result['id']}")
-            print(f"   Owner: {result['owner']}")
-            print(f"   Created: {result['created']}")
-            print(f"   Modified: {result['modified']}")
-            print(f"   Total Layers: {result.get('total_layers', 0)}")
-            print(f"   Editable Layers: {result.get('editable_layers', 0)}")
-            print(f"   Sync Enabled Layers: {result.get('sync_enabled_layers', 0)}")
-            print(f"   Field Maps Indicators:")
+            lines.append(f"\n🗺️  {result['title']}")
+            lines.append(f"   ID: {result['id']}")
+            lines.append(f"   Owner: {result['owner']}")
+            lines.append(f"   Created: {result['created']}")
+            lines.append(f"   Modified: {result['modified']}")
+            lines.append(f"   Total Layers: {_format_count(result.get('total_layers', 0))}")
+            lines.append(f"   Editable Layers: {_format_count(result.get('editable_layers', 0))}")
+            lines.append(f"   Sync Enabled Layers: {result.get('sync_enabled_layers', 0)}")
+            lines.append(f"   Field Maps Indicators:")
             for indicator in result.get('field_maps_indicators', []):
-                print(f"     • {indicator}")
+                lines.append(f"     • {indicator}")
             if not result.get('field_maps_indicators', []):
-                print(f"     • No specific indicators found")
+                lines.append(f"     • No specific indicators found")
+        
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def export_field_maps_spreadsheet_report(gis, search_query="*", max_items=10000):
@@ -795,13 +890,10 @@ def export_field_maps_spreadsheet_report(gis, search_query="*", max_items=10000)
         # Print quick summary
         print(f"\n📊 Report Summary:")
         print(f"  • Total Field Maps web maps: {len(results)}")
-        print(f"  • With editable layers: {sum(1 for r in results if r.get('editable_layers', 0) > 0)}")
+        print(f"  • With editable layers: {_count_with_editable_layers(results)}")
         print(f"  • Unique owners: {len(set(r['owner'] for r in results))}")
         print(f"  • Sharing breakdown:")
-        sharing_counts = {}
-        for r in results:
-            sharing = r.get('sharing', 'Unknown')
-            sharing_counts[sharing] = sharing_counts.get(sharing, 0) + 1
+        sharing_counts = Counter(r.get('sharing', 'Unknown') for r in results)
         for sharing_type, count in sharing_counts.items():
             print(f"    - {sharing_type}: {count}")
         
@@ -818,6 +910,7 @@ def main():
     - ARCGIS_PASSWORD: ArcGIS password (required)  
     - ARCGIS_PORTAL_URL: Portal URL (default: https://www.arcgis.com)
          - MAX_WEBMAPS: Maximum number of web maps to analyze (default: 10000)
+    - DETAIL: Set to 0 to stop at the first Field Maps indicator per web map (default: 1)
     """
     # Load credentials from environment or config
     username = os.getenv('ARCGIS_USERNAME')
@@ -829,6 +922,8 @@ def main():
         print("Optional: Set MAX_WEBMAPS to limit the number of web maps analyzed (default: 10000)")
         return
     
+    from arcgis.gis import GIS
+    
     try:
         # Connect to ArcGIS Online
         print(f"Connecting to {portal_url}...")
@@ -849,7 +944,13 @@ def main():
         max_items = int(os.getenv('MAX_WEBMAPS', '10000'))
         print(f"Will analyze up to {max_items} web maps (set MAX_WEBMAPS env var to change)")
         
-        results = analyzer.find_field_maps_webmaps(search_query=search_query, max_items=max_items)
+        # Skip the full indicator breakdown when only detection is needed
+        fast_mode = os.getenv('DETAIL', '1') == '0'
+        if fast_mode:
+            print("DETAIL=0: reporting only the first Field Maps indicator per web map")
+        
+        results = analyzer.find_field_maps_webmaps(search_query=search_query, max_items=max_items,
+                                                   fast_mode=fast_mode)
         
         # Display results
         analyzer.print_summary(results)
@@ -83,8 +83,20 @@ def test_field_maps_detection_logic():
                 self.org = True
                 self.groups = MockSharingGroupManager()
         
+        # Sharing state is never mutated, so all mock items share one instance
+        shared_sharing = MockSharingManager()
+        
+        class MockLayer(dict):
+            """Operational layer that records which layer URLs were inspected"""
+            inspected_urls = []
+            
+            def get(self, key, default=None):
+                if key == 'url':
+                    MockLayer.inspected_urls.append(dict.get(self, 'url'))
+                return dict.get(self, key, default)
+        
         class MockWebMapItem:
-            def __init__(self, title, tags, has_feature_services=False):
+            def __init__(self, title, tags, has_feature_services=False, feature_service_count=1):
                 self.id = "mock_id_123"
                 self.title = title
                 self.owner = "test_user"
@@ -92,16 +104,20 @@ def test_field_maps_detection_logic():
                 self.created = "2024-01-01T00:00:00Z"
                 self.modified = "2024-01-02T00:00:00Z"
                 self._has_feature_services = has_feature_services
+                self._feature_service_count = feature_service_count
+                self.get_data_calls = 0
                 # Mock sharing information using the new SharingManager structure
-                self.sharing = MockSharingManager()
+                self.sharing = shared_sharing
             
             def get_data(self):
+                self.get_data_calls += 1
                 operational_layers = []
                 if self._has_feature_services:
-                    operational_layers.append({
-                        'url': 'https://services.arcgis.com/test/arcgis/rest/services/TestLayer/FeatureServer/0',
-                        'itemId': 'test_layer_id'
-                    })
+                    for index in range(self._feature_service_count):
+                        operational_layers.append(MockLayer({
+                            'url': f'https://services.arcgis.com/test/arcgis/rest/services/TestLayer/FeatureServer/{index}',
+                            'itemId': f'test_layer_id_{index}'
+                        }))
                 return {
                     'operationalLayers': operational_layers
                 }
@@ -131,6 +147,17 @@ def test_field_maps_detection_logic():
                 'item': MockWebMapItem("Mobile Map", ["mobile", "offline"], False),
                 'expected': True,
                 'reason': 'Has mobile/offline tags'
+            },
+            {
+                'name': 'Mixed-case tagged map',
+                'item': MockWebMapItem("Crew Map", ["Survey123", "Field_Maps", "Collector"], False),
+                'expected': True,
+                'reason': 'Tags match case-insensitively',
+                'indicators': [
+                    'Has relevant tag: collector',
+                    'Has relevant tag: field_maps',
+                    'Has relevant tag: survey123'
+                ]
             }
         ]
         
@@ -140,8 +167,12 @@ def test_field_maps_detection_logic():
                 self.content = MockContent()
         
         class MockContent:
+            def __init__(self):
+                self.lookups = []
+            
             def get(self, item_id):
                 # Return None for item lookups since we're testing mock data
+                self.lookups.append(item_id)
                 return None
         
         from field_maps_webmap_lister import FieldMapsWebMapAnalyzer
@@ -158,21 +189,73 @@ def test_field_maps_detection_logic():
                 
                 # Check if detection worked as expected based on the full analysis result
                 detected_as_field_maps = analysis.get('is_field_maps_enabled', False)
+                indicators = analysis.get('field_maps_indicators', [])
                 
-                if detected_as_field_maps == case['expected']:
+                if detected_as_field_maps == case['expected'] and indicators == case.get('indicators', indicators):
                     print(f"✅ {case['name']}: Correctly detected ({case['reason']})")
                     passed += 1
                 else:
                     print(f"❌ {case['name']}: Detection failed")
                     print(f"    Expected: {case['expected']}, Got: {detected_as_field_maps}")
-                    print(f"    Indicators: {analysis.get('field_maps_indicators', [])}")
+                    print(f"    Expected indicators: {case.get('indicators', 'any')}, Got: {indicators}")
                     
             except Exception as e:
                 print(f"❌ {case['name']}: Exception occurred - {str(e)}")
                 # Don't count as passed if there's an exception
         
+        # Fast mode (DETAIL=0): stop at the first indicator found
+        fast_checks = 0
+        
+        # Tag-matched item returns a single indicator without fetching the web map definition
+        tagged_item = MockWebMapItem("Mobile Survey Map", ["field maps", "mobile"], True)
+        analysis = analyzer.analyze_webmap_for_field_maps(tagged_item, fast_mode=True)
+        if (analysis['is_field_maps_enabled']
+                and analysis['field_maps_indicators'] == ['Has relevant tag: field maps']
+                and tagged_item.get_data_calls == 0
+                and analysis['total_layers'] is None
+                and analysis['editable_layers'] is None):
+            print("✅ Fast mode tagged web map: Single tag indicator, get_data() not called, layer counts not measured")
+            fast_checks += 1
+        else:
+            print("❌ Fast mode tagged web map: Expected one tag indicator and no get_data() call")
+            print(f"    Indicators: {analysis['field_maps_indicators']}, get_data calls: {tagged_item.get_data_calls}, "
+                  f"layers: {analysis['total_layers']}/{analysis['editable_layers']}")
+        
+        # Feature-service item stops at the first FeatureServer layer without per-layer lookups
+        MockLayer.inspected_urls.clear()
+        gis.content.lookups.clear()
+        service_item = MockWebMapItem("Data Collection Map", ["survey"], True, feature_service_count=3)
+        analysis = analyzer.analyze_webmap_for_field_maps(service_item, fast_mode=True)
+        first_url = 'https://services.arcgis.com/test/arcgis/rest/services/TestLayer/FeatureServer/0'
+        if (analysis['is_field_maps_enabled']
+                and analysis['field_maps_indicators'] == ['Has feature service layers']
+                and MockLayer.inspected_urls == [first_url]
+                and gis.content.lookups == []
+                and analysis['total_layers'] == 3
+                and analysis['editable_layers'] is None):
+            print("✅ Fast mode feature service map: Stopped at the first FeatureServer layer, editable count not measured")
+            fast_checks += 1
+        else:
+            print("❌ Fast mode feature service map: Expected to stop at the first FeatureServer layer")
+            print(f"    Indicators: {analysis['field_maps_indicators']}, inspected: {MockLayer.inspected_urls}, "
+                  f"lookups: {gis.content.lookups}, layers: {analysis['total_layers']}/{analysis['editable_layers']}")
+        
+        # Unmeasured counts are reported as n/a rather than 0
+        import io
+        from contextlib import redirect_stdout
+        summary = io.StringIO()
+        with redirect_stdout(summary):
+            analyzer.print_summary([analysis])
+        if "Total Layers: 3" in summary.getvalue() and "Editable Layers: n/a" in summary.getvalue():
+            print("✅ Fast mode summary: Unmeasured editable count shown as n/a")
+            fast_checks += 1
+        else:
+            print("❌ Fast mode summary: Expected 'Editable Layers: n/a'")
+            print(summary.getvalue())
+        
         print(f"\nTag detection tests: {passed}/{len(test_cases)} passed")
-        return passed == len(test_cases)
+        print(f"Fast mode tests: {fast_checks}/3 passed")
+        return passed == len(test_cases) and fast_checks == 3
         
     except Exception as e:
         print(f"❌ Failed to test detection logic: {e}")
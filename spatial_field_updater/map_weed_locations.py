@@ -5,6 +5,7 @@ Create a map visualization of weed locations colored by region code with region
 
 import os
 import json
+from functools import lru_cache
 import matplotlib.pyplot as plt
 import geopandas as gpd
 import pandas as pd
@@ -20,11 +21,16 @@ def connect_arcgis():
     portal_url = os.getenv('ARCGIS_PORTAL_URL', 'https://www.arcgis.com')
     return GIS(portal_url, username, password)
 
-def get_layers(gis, environment, layer_type='regions'):
-    """Get the layers for the specified environment"""
+@lru_cache(maxsize=1)
+def load_environment_config():
+    """Load environment_config.json once per process (callers must not mutate it)"""
     env_config_path = 'config/environment_config.json'
     with open(env_config_path, 'r') as f:
-        env_config = json.load(f)
+        return json.load(f)
+
+def get_layers(gis, environment, layer_type='regions'):
+    """Get the layers for the specified environment"""
+    env_config = load_environment_config()
     
     env_settings = env_config[environment]
     weed_layer_id = env_settings['weed_locations_layer_id']
@@ -163,11 +169,7 @@ def create_weed_location_map(environment='development', sample_size=None, layer_
             # For districts, filter by region code (zoom_region should be region code)
             # We need to load regions to get districts within that region
             print(f"Loading region boundaries for district filtering...")
-            # Reload config to get region layer ID
-            env_config_path = 'config/environment_config.json'
-            with open(env_config_path, 'r') as f:
-                env_config_reload = json.load(f)
-            region_layer_id = env_config_reload[environment]['region_layer_id']  
+            region_layer_id = load_environment_config()[environment]['region_layer_id']  
             region_layer_temp = FeatureLayer.fromitem(gis.content.get(region_layer_id))
             region_query_temp = region_layer_temp.query(
                 where=f"REGC_code = '{zoom_region}'",
@@ -6,8 +6,12 @@ Uses GeoPandas and Shapely for efficient spatial joins.
 
 import os
 import json
+import time
 import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from tenacity import retry, stop_after_attempt, wait_fixed
 from arcgis.gis import GIS
 from arcgis.features import FeatureLayer, Table
@@ -17,6 +21,15 @@ from shapely.geometry import Point
 
 # Configuration - timestamps now stored in ArcGIS audit table
 
+# Maximum number of features sent in a single edit_features request
+MAX_BATCH_SIZE = 100
+
+# Number of edit_features requests in flight at once (kept low for ArcGIS rate limits)
+UPDATE_WORKERS = 3
+
+# Maximum number of OBJECTIDs in a single calculate WHERE clause
+CALCULATE_CHUNK_SIZE = 1000
+
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
 def connect_arcgis():
     username = os.getenv('ARCGIS_USERNAME')
@@ -24,11 +37,26 @@ def connect_arcgis():
     portal_url = os.getenv('ARCGIS_PORTAL_URL', 'https://www.arcgis.com')
     return GIS(portal_url, username, password)
 
-def get_layers(gis, environment):
+@lru_cache(maxsize=1)
+def load_environment_config():
+    """Load environment_config.json once per process (callers must not mutate it)"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     env_config_path = os.path.join(script_dir, 'config', 'environment_config.json')
     with open(env_config_path, 'r') as f:
-        env_config = json.load(f)
+        return json.load(f)
+
+# Layers/tables already resolved from the portal, keyed by (item id, layer class)
+_layer_cache = {}
+
+def get_layer_by_id(gis, item_id, layer_class=FeatureLayer):
+    """Resolve a layer or table from its item id, reusing the handle on repeat lookups"""
+    key = (item_id, layer_class)
+    if key not in _layer_cache:
+        _layer_cache[key] = layer_class.fromitem(gis.content.get(item_id))
+    return _layer_cache[key]
+
+def get_layers(gis, environment):
+    env_config = load_environment_config()
     
     if environment not in env_config:
         available_envs = list(env_config.keys())
@@ -40,58 +68,54 @@ def get_layers(gis, environment):
     district_layer_id = env_settings['district_layer_id']
     audit_table_id = env_settings['audit_table_id']
     
-    weed_layer = FeatureLayer.fromitem(gis.content.get(weed_layer_id))
-    region_layer = FeatureLayer.fromitem(gis.content.get(region_layer_id))
-    district_layer = FeatureLayer.fromitem(gis.content.get(district_layer_id))
-    audit_table = Table.fromitem(gis.content.get(audit_table_id))
+    # The four item lookups are independent portal round-trips, so resolve them concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        weed_future = executor.submit(get_layer_by_id, gis, weed_layer_id)
+        region_future = executor.submit(get_layer_by_id, gis, region_layer_id)
+        district_future = executor.submit(get_layer_by_id, gis, district_layer_id)
+        audit_future = executor.submit(get_layer_by_id, gis, audit_table_id, Table)
     
-    return weed_layer, region_layer, district_layer, audit_table
+    return weed_future.result(), region_future.result(), district_future.result(), audit_future.result()
 
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
 def get_last_run_date(gis, environment):
     """Get the last run date from audit table, return None if not found"""
+    audit_table_id = load_environment_config()[environment]['audit_table_id']
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        env_config_path = os.path.join(script_dir, 'config', 'environment_config.json')
-        with open(env_config_path, 'r') as f:
-            env_config = json.load(f)
-        
-        audit_table_id = env_config[environment]['audit_table_id']
-        audit_table = Table.fromitem(gis.content.get(audit_table_id))
+        audit_table = get_layer_by_id(gis, audit_table_id, Table)
         
         # Query for this process and environment
         where_clause = f"ProcessName = 'spatial_field_updater' AND Environment = '{environment}'"
-        result = audit_table.query(where=where_clause, return_all_records=False)
+        result = audit_table.query(where=where_clause, out_fields="LastRunTimestamp",
+                                   return_geometry=False, return_all_records=False)
         
         if result.features:
             timestamp_ms = result.features[0].attributes['LastRunTimestamp']
             # ArcGIS DateTime fields return milliseconds since epoch
             return datetime.fromtimestamp(timestamp_ms / 1000)
     except Exception as e:
+        # Drop the cached handle in case it has gone stale
+        _layer_cache.pop((audit_table_id, Table), None)
         print(f"Warning: Could not get last run date from audit table: {e}")
     return None
 
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
 def save_last_run_date(gis, environment):
     """Save current datetime as last run date for the specified environment in audit table"""
+    audit_table_id = load_environment_config()[environment]['audit_table_id']
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        env_config_path = os.path.join(script_dir, 'config', 'environment_config.json')
-        with open(env_config_path, 'r') as f:
-            env_config = json.load(f)
-        
-        audit_table_id = env_config[environment]['audit_table_id']
-        audit_table = Table.fromitem(gis.content.get(audit_table_id))
+        audit_table = get_layer_by_id(gis, audit_table_id, Table)
         
         # Check if record exists
         where_clause = f"ProcessName = 'spatial_field_updater' AND Environment = '{environment}'"
-        existing = audit_table.query(where=where_clause, return_all_records=False)
+        # Only the OBJECTID is needed, so skip building a FeatureSet
+        existing_ids = audit_table.query(where=where_clause, return_ids_only=True).get('objectIds') or []
         
         timestamp = datetime.now().isoformat()
         
-        if existing.features:
+        if existing_ids:
             # Update existing record
-            objectid = existing.features[0].attributes['OBJECTID']
+            objectid = existing_ids[0]
             audit_table.edit_features(updates=[{
                 'attributes': {
                     'OBJECTID': objectid,
@@ -110,6 +134,8 @@ def save_last_run_date(gis, environment):
             }])
             print(f"Created new audit record for {environment} environment")
     except Exception as e:
+        # Drop the cached handle in case it has gone stale
+        _layer_cache.pop((audit_table_id, Table), None)
         print(f"Warning: Could not save last run date to audit table for {environment}: {e}")
 
 def build_where_clause(gis, environment, process_all):
@@ -202,15 +228,17 @@ def load_boundaries_as_geopandas(region_layer, district_layer):
     """Load boundary layers as GeoPandas DataFrames - SUPER FAST!"""
     print("Loading boundary layers with GeoPandas...")
     
-    # Load regions
-    print("  Loading regions...")
-    regions_result = region_layer.query(out_fields=["REGC_code"], return_geometry=True)
+    # Query regions and districts concurrently - both are independent network calls
+    print("  Loading regions and districts...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        regions_future = executor.submit(region_layer.query, out_fields=["REGC_code"], return_geometry=True)
+        districts_future = executor.submit(district_layer.query, out_fields=["TALB_code"], return_geometry=True)
+        regions_result = regions_future.result()
+        districts_result = districts_future.result()
+    
     regions_gdf = arcgis_to_geopandas(regions_result)
     print(f"  Loaded {len(regions_gdf)} region boundaries")
     
-    # Load districts  
-    print("  Loading districts...")
-    districts_result = district_layer.query(out_fields=["TALB_code"], return_geometry=True)
     districts_gdf = arcgis_to_geopandas(districts_result)
     print(f"  Loaded {len(districts_gdf)} district boundaries")
     
@@ -229,19 +257,23 @@ def find_nearest_boundary(point_gdf, boundary_gdf, code_field, max_distance_m=10
     point_gdf = point_gdf.copy()
     nearest_codes = []
     nearest_distances = []
+    assigned_count = 0
     
-    for idx, point_row in point_gdf.iterrows():
-        point_geom = point_row.geometry
-        
+    # Resolve boundary columns once rather than on every point
+    boundary_geoms = boundary_gdf.geometry
+    boundary_codes = boundary_gdf[code_field]
+    
+    for point_geom in point_gdf.geometry:
         # Calculate distances to all boundaries
-        distances = boundary_gdf.geometry.distance(point_geom)
+        distances = boundary_geoms.distance(point_geom)
         min_distance_idx = distances.idxmin()
         min_distance = distances.loc[min_distance_idx]
         
         if min_distance <= max_distance_m:
-            nearest_code = boundary_gdf.loc[min_distance_idx, code_field]
+            nearest_code = boundary_codes.loc[min_distance_idx]
             nearest_codes.append(nearest_code)
             nearest_distances.append(min_distance)
+            assigned_count += 1
         else:
             nearest_codes.append(None)
             nearest_distances.append(min_distance)
@@ -250,7 +282,6 @@ def find_nearest_boundary(point_gdf, boundary_gdf, code_field, max_distance_m=10
     point_gdf['nearest_code'] = nearest_codes
     point_gdf['nearest_distance'] = nearest_distances
     
-    assigned_count = sum(1 for code in nearest_codes if code is not None)
     if assigned_count > 0:
         print(f"    → {assigned_count} points assigned to nearest boundaries (within {max_distance_m}m)")
     
@@ -292,9 +323,9 @@ def spatial_join_bulk(weeds_gdf, regions_gdf, districts_gdf):
         
         # Update the main dataframe with nearest assignments
         assigned_count = 0
-        for idx, row in nearest_regions.iterrows():
-            if row['nearest_code'] is not None:
-                weeds_with_regions.loc[idx, 'REGC_code'] = row['nearest_code']
+        for idx, nearest_code in zip(nearest_regions.index, nearest_regions['nearest_code']):
+            if nearest_code is not None:
+                weeds_with_regions.loc[idx, 'REGC_code'] = nearest_code
                 assigned_count += 1
         
         remaining_unassigned = len(unassigned_regions) - assigned_count
@@ -318,9 +349,9 @@ def spatial_join_bulk(weeds_gdf, regions_gdf, districts_gdf):
         
         # Update the main dataframe with nearest assignments
         assigned_count = 0
-        for idx, row in nearest_districts.iterrows():
-            if row['nearest_code'] is not None:
-                weeds_with_all.loc[idx, 'TALB_code'] = row['nearest_code']
+        for idx, nearest_code in zip(nearest_districts.index, nearest_districts['nearest_code']):
+            if nearest_code is not None:
+                weeds_with_all.loc[idx, 'TALB_code'] = nearest_code
                 assigned_count += 1
         
         remaining_unassigned = len(unassigned_districts) - assigned_count
@@ -346,15 +377,155 @@ def spatial_join_bulk(weeds_gdf, regions_gdf, districts_gdf):
     
     return weeds_with_all[result_cols]
 
+def one_result_per_feature(results_df):
+    """Keep the last spatial join row for each OBJECTID"""
+    # A point on a shared boundary intersects two polygons and gets one sjoin row per match.
+    # Keep one row per feature (the last, as sequential edits used to apply) so concurrent
+    # calculate/edit requests can never race on the same OBJECTID.
+    return results_df.drop_duplicates('OBJECTID', keep='last')
+
+def code_changes(results_df):
+    """Return boolean masks of rows whose new RegionCode / DistrictCode is present and differs"""
+    region_new = results_df['RegionCode_new']
+    district_new = results_df['DistrictCode_new']
+    region_changed = region_new.notna() & (region_new != results_df['RegionCode'])
+    district_changed = district_new.notna() & (district_new != results_df['DistrictCode'])
+    return region_changed, district_changed
+
+def count_skipped_features(results_df):
+    """Count features not updated, split into (already up to date, missing a region or district match)"""
+    results_df = one_result_per_feature(results_df)
+    region_changed, district_changed = code_changes(results_df)
+    not_updated = ~(region_changed | district_changed)
+    fully_assigned = results_df['RegionCode_new'].notna() & results_df['DistrictCode_new'].notna()
+    return int((not_updated & fully_assigned).sum()), int((not_updated & ~fully_assigned).sum())
+
+def build_update_features(results_df):
+    """Build minimal edit_features payloads (OBJECTID plus changed codes) for features needing updates"""
+    results_df = one_result_per_feature(results_df)
+    region_new = results_df['RegionCode_new']
+    district_new = results_df['DistrictCode_new']
+    region_changed, district_changed = code_changes(results_df)
+    region_changed = region_changed.to_numpy()
+    district_changed = district_changed.to_numpy()
+    
+    updates = []
+    for object_id, region_code, district_code, set_region, set_district in zip(
+            results_df['OBJECTID'].to_numpy(), region_new.to_numpy(), district_new.to_numpy(),
+            region_changed, district_changed):
+        if not (set_region or set_district):
+            continue
+        
+        # Plain int OBJECTIDs serialise cleanly (numpy int64 does not)
+        attributes = {'OBJECTID': int(object_id)}
+        if set_region:
+            attributes['RegionCode'] = region_code
+        if set_district:
+            attributes['DistrictCode'] = district_code
+        updates.append({'attributes': attributes})
+    
+    return updates
+
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
 def update_batch(weed_layer, batch):
-    result = weed_layer.edit_features(updates=batch)
+    # Apply each batch atomically server-side so a partial failure leaves no half-applied
+    # codes behind and the whole batch is safe to retry
+    result = weed_layer.edit_features(updates=batch, rollback_on_failure=True)
     if result and 'updateResults' in result:
-        return sum(1 for r in result['updateResults'] if r.get('success'))
+        # updateResults are returned in the same order as the submitted features
+        successful = 0
+        for feature, update_result in zip(batch, result['updateResults']):
+            if update_result.get('success'):
+                successful += 1
+            else:
+                error = (update_result.get('error') or {}).get('description', 'Unknown error')
+                print(f"  Feature {feature['attributes']['OBJECTID']} update failed: {error}")
+        return successful
     return 0
 
+def dedupe_updates(updates):
+    """Keep only the last update for each OBJECTID so concurrent requests never touch the same feature"""
+    latest = {feature['attributes']['OBJECTID']: feature for feature in updates}
+    return list(latest.values()) if len(latest) < len(updates) else updates
+
+def apply_updates_in_batches(weed_layer, updates, batch_size=MAX_BATCH_SIZE, max_workers=UPDATE_WORKERS):
+    """Send updates to the weed layer in concurrent batches of at most batch_size features"""
+    updates = dedupe_updates(updates)
+    batches = [updates[i:i + batch_size] for i in range(0, len(updates), batch_size)]
+    total_updated = 0
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(update_batch, weed_layer, batch) for batch in batches]
+        
+        # Report results in submission order so batch numbers stay meaningful
+        for batch_number, (batch, future) in enumerate(zip(batches, futures), 1):
+            try:
+                successful = future.result()
+                total_updated += successful
+                print(f"Updated batch {batch_number}: {successful}/{len(batch)} successful")
+            except Exception as e:
+                print(f"Batch {batch_number} update failed after retries: {e}")
+    
+    return total_updated
+
+@retry(stop=stop_after_attempt(3), wait=wait_fixed(5))
+def calculate_codes(weed_layer, object_ids, region_code, district_code):
+    """Set the same region/district codes on all object_ids with a single server-side calculate"""
+    calc_expression = []
+    if region_code is not None:
+        calc_expression.append({'field': 'RegionCode', 'value': region_code})
+    if district_code is not None:
+        calc_expression.append({'field': 'DistrictCode', 'value': district_code})
+    
+    where_clause = f"OBJECTID IN ({','.join(map(str, object_ids))})"
+    result = weed_layer.calculate(where=where_clause, calc_expression=calc_expression)
+    if not result or not result.get('success'):
+        raise RuntimeError(f"Calculate failed: {result}")
+    return result.get('updatedFeatureCount', len(object_ids))
+
+def apply_updates_by_code_group(weed_layer, updates, chunk_size=CALCULATE_CHUNK_SIZE, max_workers=UPDATE_WORKERS):
+    """Apply updates with one calculate per (RegionCode, DistrictCode) group, falling back to edit_features"""
+    updates = dedupe_updates(updates)
+    
+    # Features sharing the same new codes can be updated by a single WHERE clause
+    groups = defaultdict(list)
+    for feature in updates:
+        attributes = feature['attributes']
+        groups[(attributes.get('RegionCode'), attributes.get('DistrictCode'))].append(feature)
+    
+    chunks = [
+        (codes, group[i:i + chunk_size])
+        for codes, group in groups.items()
+        for i in range(0, len(group), chunk_size)
+    ]
+    print(f"Applying {len(updates)} updates as {len(chunks)} calculate requests ({len(groups)} code combinations)")
+    
+    total_updated = 0
+    fallback_updates = []
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(calculate_codes, weed_layer,
+                            [feature['attributes']['OBJECTID'] for feature in chunk], *codes)
+            for codes, chunk in chunks
+        ]
+        
+        for (codes, chunk), future in zip(chunks, futures):
+            try:
+                total_updated += future.result()
+            except Exception as e:
+                print(f"Calculate for RegionCode={codes[0]}, DistrictCode={codes[1]} failed after retries: {e}")
+                fallback_updates.extend(chunk)
+    
+    if fallback_updates:
+        print(f"Retrying {len(fallback_updates)} features with edit_features...")
+        total_updated += apply_updates_in_batches(weed_layer, fallback_updates)
+    
+    return total_updated
+
 def update_spatial_codes_geopandas(environment, process_all=True):
     print(f"Starting GeoPandas spatial update on '{environment}' ({'all features' if process_all else 'changed features only'})...")
+    start_time = time.perf_counter()
     
     gis = connect_arcgis()
     weed_layer, region_layer, district_layer, audit_table = get_layers(gis, environment)
@@ -367,7 +538,7 @@ def update_spatial_codes_geopandas(environment, process_all=True):
     print("Loading weed locations...")
     weed_features = weed_layer.query(
         where=where_clause,
-        out_fields=["OBJECTID", "GlobalID", "RegionCode", "DistrictCode", "EditDate_1"],
+        out_fields=["OBJECTID", "RegionCode", "DistrictCode"],
         return_geometry=True
     )
     
@@ -379,67 +550,46 @@ def update_spatial_codes_geopandas(environment, process_all=True):
         save_last_run_date(gis, environment)
         return
     
-    # Convert to GeoPandas
-    print("Converting to GeoPandas...")
-    weeds_gdf = arcgis_to_geopandas(weed_features)
-    
-    # Load boundaries as GeoPandas
-    regions_gdf, districts_gdf = load_boundaries_as_geopandas(region_layer, district_layer)
+    # Load boundaries in the background while the weed features are converted,
+    # overlapping the boundary download with the local conversion work
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        boundaries_future = executor.submit(load_boundaries_as_geopandas, region_layer, district_layer)
+        
+        # Convert to GeoPandas
+        print("Converting to GeoPandas...")
+        weeds_gdf = arcgis_to_geopandas(weed_features)
+        
+        regions_gdf, districts_gdf = boundaries_future.result()
     
     # Perform bulk spatial join - THIS IS THE MAGIC!
+    join_start = time.perf_counter()
     results_df = spatial_join_bulk(weeds_gdf, regions_gdf, districts_gdf)
+    print(f"Spatial join took {time.perf_counter() - join_start:.1f}s")
     
     # Find features that need updates
     print("Identifying features needing updates...")
-    updates = []
-    
-    for idx, row in results_df.iterrows():
-        updated = False
-        feature_dict = {
-            'attributes': {
-                'OBJECTID': row['OBJECTID']
-            }
-        }
-        
-        # Check if region code changed
-        if (pd.notna(row.get('RegionCode_new')) and 
-            row.get('RegionCode_new') != row.get('RegionCode')):
-            feature_dict['attributes']['RegionCode'] = row['RegionCode_new']
-            updated = True
-            
-        # Check if district code changed  
-        if (pd.notna(row.get('DistrictCode_new')) and 
-            row.get('DistrictCode_new') != row.get('DistrictCode')):
-            feature_dict['attributes']['DistrictCode'] = row['DistrictCode_new']
-            updated = True
-        
-        if updated:
-            updates.append(feature_dict)
+    updates = build_update_features(results_df)
     
-    print(f"Found {len(updates)} features needing updates")
+    up_to_date_count, unassigned_count = count_skipped_features(results_df)
+    print(f"Found {len(updates)} features needing updates ({up_to_date_count} already up to date, skipped)")
+    if unassigned_count:
+        print(f"Skipped {unassigned_count} features with no region or district match to assign")
     
     if len(updates) == 0:
         print("No updates needed")
     else:
-        # Apply updates in batches
-        batch_size = 100
-        total_updated = 0
-        
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i + batch_size]
-            
-            try:
-                successful = update_batch(weed_layer, batch)
-                total_updated += successful
-                print(f"Updated batch {i//batch_size + 1}: {successful}/{len(batch)} successful")
-            except Exception as e:
-                print(f"Batch update failed after retries: {e}")
-        
-        print(f"Completed: {total_updated} features updated successfully")
+        # Group identical code changes into server-side calculates where the layer supports them
+        update_start = time.perf_counter()
+        if getattr(weed_layer.properties, 'supportsCalculate', False):
+            total_updated = apply_updates_by_code_group(weed_layer, updates)
+        else:
+            total_updated = apply_updates_in_batches(weed_layer, updates)
+        print(f"Completed: {total_updated} features updated successfully in {time.perf_counter() - update_start:.1f}s")
     
     # Always save timestamp when process completes successfully
     # (represents "when we last checked" not "when we last changed")
     save_last_run_date(gis, environment)
+    print(f"Total run time: {time.perf_counter() - start_time:.1f}s")
 
 def main():
     parser = argparse.ArgumentParser(description="Update spatial codes using GeoPandas (FAST!)")
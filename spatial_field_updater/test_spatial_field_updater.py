@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Spatial Field Updater
+
+Covers building and dispatching RegionCode/DistrictCode updates without ArcGIS access.
+"""
+
+import unittest
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+# Add script directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from spatial_field_updater import (
+    build_update_features, count_skipped_features, update_batch, save_last_run_date,
+    apply_updates_in_batches, apply_updates_by_code_group
+)
+
+
+class TestSpatialFieldUpdater(unittest.TestCase):
+    """Test cases for spatial update payloads"""
+    
+    def create_results(self, rows):
+        """Create a spatial join results DataFrame from (OBJECTID, Region, District, Region_new, District_new) rows"""
+        return pd.DataFrame(rows, columns=[
+            'OBJECTID', 'RegionCode', 'DistrictCode', 'RegionCode_new', 'DistrictCode_new'
+        ])
+    
+    def test_build_updates_only_changed_codes(self):
+        """Only changed codes are sent, unchanged features are skipped"""
+        results_df = self.create_results([
+            (1, '01', '001', '01', '002'),
+            (2, '02', '010', '02', '010'),
+        ])
+        updates = build_update_features(results_df)
+        self.assertEqual(updates, [{'attributes': {'OBJECTID': 1, 'DistrictCode': '002'}}])
+    
+    def test_build_updates_one_payload_per_objectid(self):
+        """A point matching two boundaries yields a single payload, keeping the last row"""
+        results_df = self.create_results([
+            (7, None, None, '01', '001'),
+            (7, None, None, '02', '010'),
+        ])
+        updates = build_update_features(results_df)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0]['attributes'],
+                         {'OBJECTID': 7, 'RegionCode': '02', 'DistrictCode': '010'})
+
+    
+    def test_skipped_counts_separate_unassigned(self):
+        """Points with no boundary match are not reported as already up to date"""
+        results_df = self.create_results([
+            (1, '01', '001', '01', '001'),   # up to date
+            (2, '01', '001', '01', '002'),   # needs update
+            (3, None, None, None, None),     # no region or district match
+            (4, '01', '001', '01', None),    # no district match, region unchanged
+            (5, '01', '001', '01', '001'),   # duplicate sjoin rows for one feature
+            (5, '01', '001', '01', '001'),
+        ])
+        self.assertEqual(count_skipped_features(results_df), (2, 2))
+    
+    def test_update_batch_reports_failed_features(self):
+        """Partial failures are counted and each failed OBJECTID is reported with its error"""
+        batch = [
+            {'attributes': {'OBJECTID': 11, 'RegionCode': '01'}},
+            {'attributes': {'OBJECTID': 12, 'RegionCode': '01'}},
+            {'attributes': {'OBJECTID': 13, 'RegionCode': '01'}},
+        ]
+        mock_layer = Mock()
+        mock_layer.edit_features.return_value = {'updateResults': [
+            {'objectId': 11, 'success': True},
+            {'objectId': 12, 'success': False, 'error': {'code': 1000, 'description': 'Field is not editable'}},
+            {'objectId': 13, 'success': True},
+        ]}
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            successful = update_batch(mock_layer, batch)
+        
+        self.assertEqual(successful, 2)
+        mock_layer.edit_features.assert_called_once_with(updates=batch, rollback_on_failure=True)
+        self.assertIn("Feature 12 update failed: Field is not editable", output.getvalue())
+        self.assertNotIn("Feature 11", output.getvalue())
+    
+    def run_save_last_run_date(self, query_result):
+        """Run save_last_run_date against a mock audit table returning query_result"""
+        mock_table = Mock()
+        mock_table.query.return_value = query_result
+        with patch('spatial_field_updater.get_layer_by_id', return_value=mock_table), \
+                redirect_stdout(io.StringIO()):
+            save_last_run_date(Mock(), 'development')
+        mock_table.query.assert_called_once_with(
+            where="ProcessName = 'spatial_field_updater' AND Environment = 'development'",
+            return_ids_only=True
+        )
+        return mock_table
+    
+    def test_save_last_run_date_updates_existing_row(self):
+        """An existing audit row id from return_ids_only is updated in place"""
+        mock_table = self.run_save_last_run_date({'objectIdFieldName': 'OBJECTID', 'objectIds': [42]})
+        kwargs = mock_table.edit_features.call_args.kwargs
+        self.assertEqual(list(kwargs), ['updates'])
+        self.assertEqual(len(kwargs['updates']), 1)
+        self.assertEqual(kwargs['updates'][0]['attributes']['OBJECTID'], 42)
+        self.assertIn('LastRunTimestamp', kwargs['updates'][0]['attributes'])
+    
+    def test_save_last_run_date_adds_missing_row(self):
+        """Empty or None objectIds inserts a new audit row"""
+        for object_ids in ([], None):
+            mock_table = self.run_save_last_run_date({'objectIdFieldName': 'OBJECTID', 'objectIds': object_ids})
+            kwargs = mock_table.edit_features.call_args.kwargs
+            self.assertEqual(list(kwargs), ['adds'])
+            attributes = kwargs['adds'][0]['attributes']
+            self.assertEqual(attributes['ProcessName'], 'spatial_field_updater')
+            self.assertEqual(attributes['Environment'], 'development')
+            self.assertIn('LastRunTimestamp', attributes)
+    
+    def create_duplicate_updates(self):
+        """Updates where OBJECTID 7 appears twice with different codes"""
+        return [
+            {'attributes': {'OBJECTID': 7, 'RegionCode': '01', 'DistrictCode': '001'}},
+            {'attributes': {'OBJECTID': 8, 'RegionCode': '01', 'DistrictCode': '001'}},
+            {'attributes': {'OBJECTID': 7, 'RegionCode': '02', 'DistrictCode': '010'}},
+        ]
+    
+    def test_batches_send_each_objectid_once(self):
+        """Concurrent edit_features batches never contain the same OBJECTID twice"""
+        mock_layer = Mock()
+        mock_layer.edit_features.side_effect = lambda updates, **kwargs: {
+            'updateResults': [{'success': True} for _ in updates]
+        }
+        
+        total = apply_updates_in_batches(mock_layer, self.create_duplicate_updates(), batch_size=1)
+        
+        sent = [feature['attributes'] for call in mock_layer.edit_features.call_args_list
+                for feature in call.kwargs['updates']]
+        self.assertEqual(total, 2)
+        self.assertEqual(sorted(attributes['OBJECTID'] for attributes in sent), [7, 8])
+        self.assertIn({'OBJECTID': 7, 'RegionCode': '02', 'DistrictCode': '010'}, sent)
+    
+    def test_code_groups_send_each_objectid_once(self):
+        """Concurrent calculate requests never target the same OBJECTID twice"""
+        mock_layer = Mock()
+        mock_layer.calculate.side_effect = lambda where, calc_expression: {
+            'success': True, 'updatedFeatureCount': where.count(',') + 1
+        }
+        
+        total = apply_updates_by_code_group(mock_layer, self.create_duplicate_updates())
+        
+        calls = {call.kwargs['where']: call.kwargs['calc_expression']
+                 for call in mock_layer.calculate.call_args_list}
+        self.assertEqual(total, 2)
+        self.assertEqual(calls, {
+            'OBJECTID IN (8)': [{'field': 'RegionCode', 'value': '01'}, {'field': 'DistrictCode', 'value': '001'}],
+            'OBJECTID IN (7)': [{'field': 'RegionCode', 'value': '02'}, {'field': 'DistrictCode', 'value': '010'}],
+        })
+        mock_layer.edit_features.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)